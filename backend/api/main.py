@@ -5,6 +5,10 @@ Exposes: score computation, on-chain submission, lending position reads.
 
 import sys
 import os
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 # Ensure backend/ is on the path regardless of how uvicorn is invoked
@@ -14,9 +18,11 @@ if _backend_dir not in sys.path:
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
-from scoring.btc_fetcher import fetch_wallet_data
+from scoring.btc_fetcher import fetch_wallet_data, close_client
 from scoring.scorer import compute_score
 from zkproof.proof_gen import (
     generate_proof,
@@ -24,16 +30,56 @@ from zkproof.proof_gen import (
     calldata_to_dict,
     btc_address_to_hex_felt,
 )
-from starknet_client import StarknetClient
+from starknet_client import StarknetClient, SubmissionBatcher, SubmissionRejected
 
 from vesu_intergration import router as vesu_router 
 
+logger = logging.getLogger("bitcred.api")
+
 starknet = StarknetClient()
 
+# When enabled, submit_onchain requests are registered by the backend scorer
+# account in batched transactions instead of being left to the frontend
+# (note: the registering account becomes the on-chain score owner)
+BACKEND_SUBMIT_ONCHAIN = os.environ.get("BACKEND_SUBMIT_ONCHAIN", "").lower() in ("1", "true", "yes")
+batcher = SubmissionBatcher(starknet)
+
+def start_logging() -> tuple[QueueHandler, QueueListener]:
+    """
+    Send "bitcred.*" records through a queue; a listener thread does the
+    actual stream writes so logging never blocks the event loop.
+    """
+    log_queue = queue.SimpleQueue()
+    stream = logging.StreamHandler()
+    stream.setFormatter(logging.Formatter("[%(levelname)s] %(name)s: %(message)s"))
+    listener = QueueListener(log_queue, stream)
+
+    handler = QueueHandler(log_queue)
+    root = logging.getLogger("bitcred")
+    root.setLevel(os.environ.get("LOG_LEVEL", "INFO").upper())
+    root.addHandler(handler)
+    root.propagate = False
+
+    listener.start()
+    return handler, listener
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    log_handler, log_listener = start_logging()
+    yield
+    await close_client()
+    await starknet.close()
+    logging.getLogger("bitcred").removeHandler(log_handler)
+    log_listener.stop()
+
+
 app = FastAPI(
     title="BitCred API",
     description="Bitcoin credit scoring for DeFi lending on Starknet",
     version="0.2.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # ─── CORS ─────────────────────────────────────────────────────────────────────
@@ -51,6 +97,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 app.include_router(vesu_router, prefix="/vesu", tags=["Vesu"])
 
 # ─── Models ───────────────────────────────────────────────────────────────────
@@ -60,6 +108,9 @@ class ScoreRequest(BaseModel):
     submit_onchain: bool = False
 
 
+# Response models are built with model_construct(): their values come from our
+# own scorer / RPC code, so only the inbound ScoreRequest is validated.
+
 class ScoreResponse(BaseModel):
     btc_address_hash: str
     score: int
@@ -117,13 +168,20 @@ async def compute_credit_score(req: ScoreRequest):
     calldata_json = calldata_to_dict(calldata)
 
     tx_hash = None
-    if req.submit_onchain:
+    if req.submit_onchain and BACKEND_SUBMIT_ONCHAIN:
+        try:
+            tx_hash = await batcher.submit(calldata.btc_address_hash, calldata.score, calldata.proof)
+        except SubmissionRejected as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=502, detail=f"Starknet submission error: {str(e)}")
+    elif req.submit_onchain:
         tx_hash = "frontend_submission_required"
-        print(f"[INFO] Score computed for {calldata.btc_address_hash}, awaiting frontend submission")
+        logger.info("Score computed for %s, awaiting frontend submission", hex(calldata.btc_address_hash))
 
     tier_labels = {1: "Diamond Hands 💎", 2: "Strong Holder", 3: "Moderate Holder", 4: "New Holder"}
 
-    return ScoreResponse(
+    return ScoreResponse.model_construct(
         btc_address_hash=proof.btc_address_hash_hex,
         score=result.raw_score,
         tier=result.tier,
@@ -182,11 +240,16 @@ async def update_credit_score(req: ScoreRequest):
         proof = generate_proof(req.btc_address, result)
         calldata = proof_to_calldata(proof)
         
-        tx_hash = "frontend_submission_required" if req.submit_onchain else None
+        tx_hash = None
+        if req.submit_onchain and BACKEND_SUBMIT_ONCHAIN:
+            tx_hash = await batcher.submit(
+                calldata.btc_address_hash, calldata.score, calldata.proof, entry_point="update_score")
+        elif req.submit_onchain:
+            tx_hash = "frontend_submission_required"
         
         tier_labels = {1: "Diamond Hands 💎", 2: "Strong Holder", 3: "Moderate Holder", 4: "New Holder"}
         
-        return ScoreResponse(
+        return ScoreResponse.model_construct(
             btc_address_hash=proof.btc_address_hash_hex,
             score=result.raw_score,
             tier=result.tier,
@@ -200,6 +263,8 @@ async def update_credit_score(req: ScoreRequest):
         )
     except HTTPException:
         raise
+    except SubmissionRejected as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -214,7 +279,7 @@ async def get_onchain_score(btc_address: str):
     except Exception as e:
         raise HTTPException(status_code=502, detail=str(e))
 
-    return RatioResponse(
+    return RatioResponse.model_construct(
         btc_address_hash=hex(addr_hash_int),
         collateral_ratio_bps=ratio,
         collateral_ratio_pct=ratio / 100,
@@ -229,7 +294,7 @@ async def get_lending_position(starknet_address: str):
         pos = await starknet.get_position(starknet_address)
     except Exception as e:
         raise HTTPException(status_code=502, detail=str(e))
-    return PositionResponse(**{k: pos[k] for k in PositionResponse.model_fields})
+    return PositionResponse.model_construct(**{k: pos[k] for k in PositionResponse.model_fields})
 
 
 @app.get("/liquidity")
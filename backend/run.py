@@ -31,4 +31,7 @@ if __name__ == "__main__":
         reload=reload,
         reload_dirs=[backend_dir] if reload else None,
         env_file=env_file,
+        # uvloop is POSIX-only; uvicorn[standard] installs it everywhere else
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
     )
\ No newline at end of file
@@ -10,9 +10,13 @@ APIs supported (in priority order):
 All APIs are free tier compatible.
 """
 
+import os
+import time
+import logging
 import httpx
+import orjson
 import asyncio
-from datetime import datetime, timezone
+from cachetools import TTLCache
 from collections import defaultdict
 from typing import Optional
 
@@ -24,6 +28,9 @@ except ImportError:
     from scorer import WalletData, UTXO, MonthlySnapshot
 
 
+logger = logging.getLogger("bitcred.fetcher")
+
+
 # API endpoints
 BLOCKCHAIN_API = "https://blockchain.info"
 MEMPOOL_API = "https://mempool.space/api"
@@ -31,6 +38,75 @@ BLOCKSTREAM_API = "https://blockstream.info/api"
 
 SATOSHI = 100_000_000
 
+# Monthly snapshot window handed to the scorer
+SNAPSHOT_MONTHS = 12
+
+# Short-lived cache of fetched wallets, so re-scoring an address skips the APIs
+WALLET_CACHE_SIZE = int(os.environ.get("BITCRED_WALLET_CACHE_SIZE", 10_000))
+WALLET_CACHE_TTL = float(os.environ.get("BITCRED_WALLET_CACHE_TTL", 300))
+
+_wallet_cache: TTLCache = TTLCache(maxsize=WALLET_CACHE_SIZE, ttl=WALLET_CACHE_TTL)
+# One in-flight fetch per address; concurrent callers share its result or error
+_inflight: dict[str, asyncio.Task] = {}
+
+# Shared keep-alive HTTP/2 client, created on first use
+_client: httpx.AsyncClient | None = None
+
+
+async def get_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            timeout=20.0,
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared HTTP client (called on app shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+# ─── Month bucketing ──────────────────────────────────────────────────────────
+
+def _month_key(ts: int) -> int:
+    """
+    UTC calendar month of an epoch timestamp, as year * 12 + (month - 1).
+    Pure integer arithmetic (Hinnant's civil_from_days), no datetime objects.
+    """
+    z = ts // 86400 + 719468
+    era = z // 146097
+    doe = z - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    month = mp + 3 if mp < 10 else mp - 9
+    year = yoe + era * 400 + (month <= 2)
+    return year * 12 + month - 1
+
+
+def _format_month(key: int) -> str:
+    """Render a _month_key value as "YYYY-MM"."""
+    return f"{key // 12:04d}-{key % 12 + 1:02d}"
+
+
+def _current_month() -> str:
+    return _format_month(_month_key(int(time.time())))
+
+
+async def _get_json_concurrently(client: httpx.AsyncClient, *urls: str) -> list:
+    """GET several URLs at once; raises on the first non-2xx response."""
+    responses = await asyncio.gather(*(client.get(url, timeout=20.0) for url in urls))
+    for resp in responses:
+        resp.raise_for_status()
+    return [resp.json() for resp in responses]
+
 
 # ─── Blockchain.com API (PRIMARY) ─────────────────────────────────────────────
 
@@ -39,13 +115,13 @@ async def fetch_blockchain_com(address: str, client: httpx.AsyncClient) -> Walle
     Fetch wallet data from Blockchain.com API.
     Most reliable option - returns complete transaction history.
     """
-    print(f"[INFO] Trying Blockchain.com API...")
+    logger.info("Trying Blockchain.com API")
     
     # Fetch raw address data (includes UTXOs and transactions)
     url = f"{BLOCKCHAIN_API}/rawaddr/{address}?limit=50"
     resp = await client.get(url, timeout=20.0)
     resp.raise_for_status()
-    data = resp.json()
+    data = orjson.loads(resp.content)
     
     # Parse UTXOs
     utxos = []
@@ -64,7 +140,7 @@ async def fetch_blockchain_com(address: str, client: httpx.AsyncClient) -> Walle
         data.get("final_balance", 0)
     )
     
-    print(f"[SUCCESS] Blockchain.com: {len(utxos)} UTXOs, {len(monthly_snapshots)} months")
+    logger.info("Blockchain.com: %d UTXOs, %d months", len(utxos), len(monthly_snapshots))
     
     return WalletData(
         address=address,
@@ -75,59 +151,70 @@ async def fetch_blockchain_com(address: str, client: httpx.AsyncClient) -> Walle
 
 
 def _build_monthly_snapshots_from_txs(txs: list, address: str, final_balance: int) -> list[MonthlySnapshot]:
-    """Build monthly snapshots from transaction list."""
+    """
+    Build monthly snapshots from transaction list.
+
+    Single pass over txs bucketed by integer month key; the running balance
+    spans all months, and the last SNAPSHOT_MONTHS active months are emitted.
+    """
     if not txs:
         # No transactions, use final balance as current state
-        current_month = datetime.now(timezone.utc).strftime("%Y-%m")
+        current_month = _current_month()
         return [MonthlySnapshot(month=current_month, balance_sats=final_balance, tx_count=0)]
     
-    # Sort by time ascending
-    txs_sorted = sorted(txs, key=lambda t: t.get("time", 0))
-    
     monthly_delta = defaultdict(int)
     monthly_tx_count = defaultdict(int)
     
-    for tx in txs_sorted:
-        timestamp = tx.get("time", 0)
+    for tx in txs:
+        try:
+            timestamp = tx["time"]
+        except KeyError:
+            continue
         if not timestamp:
             continue
         
-        dt = datetime.fromtimestamp(timestamp, tz=timezone.utc)
-        month_key = dt.strftime("%Y-%m")
+        month_key = _month_key(timestamp)
         monthly_tx_count[month_key] += 1
         
-        # Calculate net change for this address
+        # Calculate net change for this address.
+        # Direct indexing; coinbase inputs / non-standard outputs lack keys.
         net = 0
         
         # Subtract inputs (money leaving)
-        for inp in tx.get("inputs", []):
-            prev_out = inp.get("prev_out", {})
-            if prev_out.get("addr") == address:
-                net -= prev_out.get("value", 0)
+        for inp in tx.get("inputs", ()):
+            try:
+                prev_out = inp["prev_out"]
+                if prev_out["addr"] == address:
+                    net -= prev_out["value"]
+            except KeyError:
+                pass
         
         # Add outputs (money coming in)
-        for out in tx.get("out", []):
-            if out.get("addr") == address:
-                net += out.get("value", 0)
+        for out in tx.get("out", ()):
+            try:
+                if out["addr"] == address:
+                    net += out["value"]
+            except KeyError:
+                pass
         
         monthly_delta[month_key] += net
     
-    # Build snapshots
+    # Running balance over every active month; only the tail is emitted
+    months_sorted = sorted(monthly_delta)
+    first_emitted = len(months_sorted) - SNAPSHOT_MONTHS
     snapshots = []
-    months_sorted = sorted(monthly_delta.keys())
     running_balance = 0
     
-    for month in months_sorted:
-        running_balance += monthly_delta[month]
-        running_balance = max(0, running_balance)
-        snapshots.append(MonthlySnapshot(
-            month=month,
-            balance_sats=running_balance,
-            tx_count=monthly_tx_count[month],
-        ))
+    for i, month_key in enumerate(months_sorted):
+        running_balance = max(0, running_balance + monthly_delta[month_key])
+        if i >= first_emitted:
+            snapshots.append(MonthlySnapshot(
+                month=_format_month(month_key),
+                balance_sats=running_balance,
+                tx_count=monthly_tx_count[month_key],
+            ))
     
-    # Return last 12 months
-    return snapshots[-12:] if len(snapshots) > 12 else snapshots
+    return snapshots
 
 
 # ─── Mempool.space API (FALLBACK 1) ───────────────────────────────────────────
@@ -137,41 +224,31 @@ async def fetch_mempool_space(address: str, client: httpx.AsyncClient) -> Wallet
     Fetch wallet data from Mempool.space API.
     Good fallback, but limited transaction history.
     """
-    print(f"[INFO] Trying Mempool.space API...")
-    
-    # Fetch UTXOs
-    utxo_url = f"{MEMPOOL_API}/address/{address}/utxo"
-    resp = await client.get(utxo_url, timeout=20.0)
-    resp.raise_for_status()
-    utxo_data = resp.json()
+    logger.info("Trying Mempool.space API")
+    
+    # Fetch UTXOs, address info (for balance) and recent transactions
+    # (limited to 25) concurrently
+    utxo_data, addr_data, txs = await _get_json_concurrently(
+        client,
+        f"{MEMPOOL_API}/address/{address}/utxo",
+        f"{MEMPOOL_API}/address/{address}",
+        f"{MEMPOOL_API}/address/{address}/txs",
+    )
     
     utxos = []
-    now = datetime.now(timezone.utc)
+    now_ts = int(time.time())
     
     for utxo in utxo_data:
         value_sats = utxo.get("value", 0)
         status = utxo.get("status", {})
         
         if status.get("confirmed") and status.get("block_time"):
-            block_time = datetime.fromtimestamp(status["block_time"], tz=timezone.utc)
-            age_days = (now - block_time).days
+            age_days = max(0, (now_ts - status["block_time"]) // 86400)
         else:
             age_days = 0
         
         utxos.append(UTXO(value_sats=value_sats, age_days=age_days))
     
-    # Fetch address info for balance
-    addr_url = f"{MEMPOOL_API}/address/{address}"
-    addr_resp = await client.get(addr_url, timeout=20.0)
-    addr_resp.raise_for_status()
-    addr_data = addr_resp.json()
-    
-    # Fetch recent transactions (limited to 25)
-    tx_url = f"{MEMPOOL_API}/address/{address}/txs"
-    tx_resp = await client.get(tx_url, timeout=20.0)
-    tx_resp.raise_for_status()
-    txs = tx_resp.json()
-    
     # Build simplified monthly snapshots
     monthly_snapshots = _build_monthly_snapshots_mempool(
         txs,
@@ -180,7 +257,7 @@ async def fetch_mempool_space(address: str, client: httpx.AsyncClient) -> Wallet
         addr_data.get("chain_stats", {}).get("spent_txo_sum", 0)
     )
     
-    print(f"[SUCCESS] Mempool.space: {len(utxos)} UTXOs, {len(monthly_snapshots)} months")
+    logger.info("Mempool.space: %d UTXOs, %d months", len(utxos), len(monthly_snapshots))
     
     return WalletData(
         address=address,
@@ -193,7 +270,7 @@ async def fetch_mempool_space(address: str, client: httpx.AsyncClient) -> Wallet
 def _build_monthly_snapshots_mempool(txs: list, address: str, current_balance: int) -> list[MonthlySnapshot]:
     """Build monthly snapshots from Mempool.space transaction format."""
     if not txs:
-        current_month = datetime.now(timezone.utc).strftime("%Y-%m")
+        current_month = _current_month()
         return [MonthlySnapshot(month=current_month, balance_sats=current_balance, tx_count=0)]
     
     monthly_tx_count = defaultdict(int)
@@ -201,15 +278,14 @@ def _build_monthly_snapshots_mempool(txs: list, address: str, current_balance: i
     for tx in txs:
         status = tx.get("status", {})
         if status.get("confirmed") and status.get("block_time"):
-            dt = datetime.fromtimestamp(status["block_time"], tz=timezone.utc)
-            month_key = dt.strftime("%Y-%m")
+            month_key = _month_key(status["block_time"])
             monthly_tx_count[month_key] += 1
     
     # Create snapshots (simplified - just track tx counts)
     snapshots = []
     for month, count in sorted(monthly_tx_count.items())[-12:]:
         snapshots.append(MonthlySnapshot(
-            month=month,
+            month=_format_month(month),
             balance_sats=current_balance,  # Approximation
             tx_count=count,
         ))
@@ -224,41 +300,30 @@ async def fetch_blockstream(address: str, client: httpx.AsyncClient) -> WalletDa
     Fetch wallet data from Blockstream.info API.
     Last resort fallback.
     """
-    print(f"[INFO] Trying Blockstream.info API...")
-    
-    # Fetch UTXOs
-    utxo_url = f"{BLOCKSTREAM_API}/address/{address}/utxo"
-    resp = await client.get(utxo_url, timeout=20.0)
-    resp.raise_for_status()
-    utxo_data = resp.json()
+    logger.info("Trying Blockstream.info API")
+    
+    # Fetch UTXOs, transactions and address stats concurrently
+    utxo_data, txs, addr_data = await _get_json_concurrently(
+        client,
+        f"{BLOCKSTREAM_API}/address/{address}/utxo",
+        f"{BLOCKSTREAM_API}/address/{address}/txs",
+        f"{BLOCKSTREAM_API}/address/{address}",
+    )
     
     utxos = []
-    now = datetime.now(timezone.utc)
+    now_ts = int(time.time())
     
     for utxo in utxo_data:
         value_sats = utxo.get("value", 0)
         status = utxo.get("status", {})
         
         if status.get("confirmed") and status.get("block_time"):
-            block_time = datetime.fromtimestamp(status["block_time"], tz=timezone.utc)
-            age_days = (now - block_time).days
+            age_days = max(0, (now_ts - status["block_time"]) // 86400)
         else:
             age_days = 0
         
         utxos.append(UTXO(value_sats=value_sats, age_days=age_days))
     
-    # Fetch transactions
-    tx_url = f"{BLOCKSTREAM_API}/address/{address}/txs"
-    tx_resp = await client.get(tx_url, timeout=20.0)
-    tx_resp.raise_for_status()
-    txs = tx_resp.json()
-    
-    # Fetch address stats
-    addr_url = f"{BLOCKSTREAM_API}/address/{address}"
-    addr_resp = await client.get(addr_url, timeout=20.0)
-    addr_resp.raise_for_status()
-    addr_data = addr_resp.json()
-    
     # Build monthly snapshots (similar to Mempool)
     monthly_snapshots = _build_monthly_snapshots_blockstream(
         txs,
@@ -266,7 +331,7 @@ async def fetch_blockstream(address: str, client: httpx.AsyncClient) -> WalletDa
         addr_data
     )
     
-    print(f"[SUCCESS] Blockstream: {len(utxos)} UTXOs, {len(monthly_snapshots)} months")
+    logger.info("Blockstream: %d UTXOs, %d months", len(utxos), len(monthly_snapshots))
     
     return WalletData(
         address=address,
@@ -279,7 +344,7 @@ async def fetch_blockstream(address: str, client: httpx.AsyncClient) -> WalletDa
 def _build_monthly_snapshots_blockstream(txs: list, address: str, addr_data: dict) -> list[MonthlySnapshot]:
     """Build monthly snapshots from Blockstream transaction format."""
     if not txs:
-        current_month = datetime.now(timezone.utc).strftime("%Y-%m")
+        current_month = _current_month()
         current_balance = addr_data.get("chain_stats", {}).get("funded_txo_sum", 0) - \
                          addr_data.get("chain_stats", {}).get("spent_txo_sum", 0)
         return [MonthlySnapshot(month=current_month, balance_sats=current_balance, tx_count=0)]
@@ -292,8 +357,7 @@ def _build_monthly_snapshots_blockstream(txs: list, address: str, addr_data: dic
         if not status.get("confirmed") or not status.get("block_time"):
             continue
         
-        dt = datetime.fromtimestamp(status["block_time"], tz=timezone.utc)
-        month_key = dt.strftime("%Y-%m")
+        month_key = _month_key(status["block_time"])
         monthly_tx_count[month_key] += 1
         
         # Calculate net for this address
@@ -317,7 +381,7 @@ def _build_monthly_snapshots_blockstream(txs: list, address: str, addr_data: dic
         running_balance += monthly_delta[month]
         running_balance = max(0, running_balance)
         snapshots.append(MonthlySnapshot(
-            month=month,
+            month=_format_month(month),
             balance_sats=running_balance,
             tx_count=monthly_tx_count[month],
         ))
@@ -325,16 +389,85 @@ def _build_monthly_snapshots_blockstream(txs: list, address: str, addr_data: dic
     return snapshots[-12:]
 
 
-# ─── Main Fetcher with Cascading Fallbacks ────────────────────────────────────
+# ─── Main Fetcher with Hedged Fallbacks ───────────────────────────────────────
+
+# Delay before each lower-priority API is started alongside the ones above it
+# A fallback's result is only used once every higher-priority API has failed
+# or been outstanding this long (sources differ, e.g. Mempool.space reports a
+# flat balance history, so the winner must not depend on latency alone)
+PREFERRED_DEADLINE = 5.0
+
+# Fallbacks start early only when every API above them has failed; otherwise
+# shortly before the deadline (staggered by HEDGE_DELAY), so a slow-but-healthy
+# primary doesn't cost extra requests against the free-tier fallbacks
+FALLBACK_START = 4.0
+HEDGE_DELAY = 0.5
+
+FETCHERS = [
+    ("Blockchain.com", fetch_blockchain_com),
+    ("Mempool.space", fetch_mempool_space),
+    ("Blockstream", fetch_blockstream),
+]
 
 async def fetch_wallet_data(address: str) -> WalletData:
     """
-    Fetch wallet data with automatic fallback between APIs.
+    Fetch wallet data, served from a TTL cache when the address was fetched
+    recently. Concurrent requests for the same address share one fetch,
+    including its failure.
+
+    Raises:
+        ValueError: Invalid address format
+        Exception: All APIs failed
+    """
+    cached = _wallet_cache.get(address)
+    if cached is not None:
+        return cached
+
+    task = _inflight.get(address)
+    if task is None:
+        task = asyncio.create_task(_fetch_and_cache(address))
+        _inflight[address] = task
+        task.add_done_callback(lambda t: _fetch_done(address, t))
+    # shield: a cancelled caller must not cancel the fetch the others await
+    return await asyncio.shield(task)
+
+
+async def _fetch_and_cache(address: str) -> WalletData:
+    wallet = await _fetch_wallet_data_uncached(address)
+    _wallet_cache[address] = wallet
+    return wallet
+
+
+def _fetch_done(address: str, task: asyncio.Task) -> None:
+    if _inflight.get(address) is task:
+        del _inflight[address]
+    if not task.cancelled():
+        task.exception()  # mark retrieved even if every caller went away
+
+
+async def _hedged_fetch(fetcher, address: str, client: httpx.AsyncClient,
+                        delay: float, go: asyncio.Event) -> WalletData:
+    """Run a fetcher after `delay` seconds, or as soon as `go` is set."""
+    if not go.is_set():
+        try:
+            await asyncio.wait_for(go.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+    return await fetcher(address, client)
+
+
+async def _fetch_wallet_data_uncached(address: str) -> WalletData:
+    """
+    Fetch wallet data, racing the APIs with staggered (hedged) starts.
     
     Priority:
     1. Blockchain.com (most complete data)
-    2. Mempool.space (good fallback)
-    3. Blockstream.info (last resort)
+    2. Mempool.space (good fallback, starts after FALLBACK_START)
+    3. Blockstream.info (last resort, starts after FALLBACK_START + HEDGE_DELAY)
+    
+    A fallback starts immediately once every API above it has failed. The
+    highest-priority successful response is used; a lower-priority one wins
+    only when every API above it has failed or exceeded PREFERRED_DEADLINE.
     
     Raises:
         ValueError: Invalid address format
@@ -345,43 +478,67 @@ async def fetch_wallet_data(address: str) -> WalletData:
         raise ValueError(f"Invalid Bitcoin address format: {address}")
     
     errors = []
-    
-    async with httpx.AsyncClient() as client:
-        # Try Blockchain.com first
-        try:
-            return await fetch_blockchain_com(address, client)
-        except httpx.HTTPStatusError as e:
-            error_msg = f"Blockchain.com: HTTP {e.response.status_code}"
-            errors.append(error_msg)
-            print(f"[WARN] {error_msg}")
-        except Exception as e:
-            error_msg = f"Blockchain.com: {str(e)}"
-            errors.append(error_msg)
-            print(f"[WARN] {error_msg}")
-        
-        # Try Mempool.space
-        try:
-            return await fetch_mempool_space(address, client)
-        except httpx.HTTPStatusError as e:
-            error_msg = f"Mempool.space: HTTP {e.response.status_code}"
-            errors.append(error_msg)
-            print(f"[WARN] {error_msg}")
-        except Exception as e:
-            error_msg = f"Mempool.space: {str(e)}"
-            errors.append(error_msg)
-            print(f"[WARN] {error_msg}")
-        
-        # Try Blockstream as last resort
-        try:
-            return await fetch_blockstream(address, client)
-        except httpx.HTTPStatusError as e:
-            error_msg = f"Blockstream: HTTP {e.response.status_code}"
-            errors.append(error_msg)
-            print(f"[ERROR] {error_msg}")
-        except Exception as e:
-            error_msg = f"Blockstream: {str(e)}"
-            errors.append(error_msg)
-            print(f"[ERROR] {error_msg}")
+    go = [asyncio.Event() for _ in FETCHERS]
+    go[0].set()
+    
+    client = await get_client()
+    tasks = {
+        asyncio.create_task(
+            _hedged_fetch(fetcher, address, client,
+                          FALLBACK_START + (i - 1) * HEDGE_DELAY, go[i])
+        ): name
+        for i, (name, fetcher) in enumerate(FETCHERS)
+    }
+    priority = list(tasks)
+    failed = set()
+    pending = set(tasks)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + PREFERRED_DEADLINE
+    try:
+        while True:
+            # Walk in priority order: first success wins, unless a preferred
+            # source is still running and within its deadline
+            waiting = loop.time() < deadline
+            for rank, task in enumerate(priority):
+                if not task.done():
+                    if waiting:
+                        break
+                    continue
+                if task.exception() is None:
+                    if rank:
+                        logger.warning("Using fallback %s for %s", tasks[task], address)
+                    else:
+                        logger.info("Wallet data for %s from %s", address, tasks[task])
+                    return task.result()
+            
+            if not pending:
+                break
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=max(0.0, deadline - loop.time()) if waiting else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for task in sorted(done, key=priority.index):
+                e = task.exception()
+                if e is None:
+                    continue
+                if isinstance(e, httpx.HTTPStatusError):
+                    error_msg = f"{tasks[task]}: HTTP {e.response.status_code}"
+                else:
+                    error_msg = f"{tasks[task]}: {str(e)}"
+                errors.append(error_msg)
+                logger.warning("%s", error_msg)
+                failed.add(task)
+            # Start the next API in line once everything above it has failed
+            for rank, task in enumerate(priority):
+                go[rank].set()
+                if task not in failed:
+                    break
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
     
     # All APIs failed
     raise Exception(
@@ -394,6 +551,8 @@ async def fetch_wallet_data(address: str) -> WalletData:
 if __name__ == "__main__":
     import sys
     
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+    
     test_addresses = [
         "1A1zP1eP5QGefi2DMPTfTL5SLmv7DivfNa",  # Satoshi's address
         "bc1qgdjqv0av3q56jvd82tkdjpy7gdp9ut8tlqmgrpmv24sq90ecnvqqjwvw97",  # Modern bech32
@@ -434,5 +593,8 @@ if __name__ == "__main__":
             print(f"❌ FAILED")
             print(f"{'='*60}\n")
             print(f"Error: {e}\n")
+        
+        finally:
+            await close_client()
     
     asyncio.run(main())
\ No newline at end of file
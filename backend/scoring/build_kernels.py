@@ -0,0 +1,33 @@
+"""
+Ahead-of-time build of the BitCred scoring kernels.
+
+    cd backend && python -m scoring.build_kernels
+
+Compiles the Numba kernels from scoring/scorer.py into the native extension
+scoring/bitcred_kernels, which scorer.py imports in place of JIT compilation.
+Requires numba and a C compiler at build time only.
+"""
+
+from pathlib import Path
+
+from numba.pycc import CC
+
+from scoring.scorer import _hodl_kernel, _freq_kernel, _stability_kernel
+
+
+def _py(fn):
+    """Undecorated source of a (possibly @njit-wrapped) kernel."""
+    return getattr(fn, "py_func", fn)
+
+
+cc = CC("bitcred_kernels")
+cc.output_dir = str(Path(__file__).resolve().parent)
+
+cc.export("hodl", "f8(i8[:], i4[:])")(_py(_hodl_kernel))
+cc.export("freq", "f8(i4[:])")(_py(_freq_kernel))
+cc.export("stability", "UniTuple(f8, 3)(f8[:])")(_py(_stability_kernel))
+
+
+if __name__ == "__main__":
+    cc.compile()
+    print(f"Built bitcred_kernels in {cc.output_dir}")
@@ -9,11 +9,22 @@ Metrics:
 """
 
 import numpy as np
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
 import hashlib
+import struct
 import time
-import json
+import orjson
+from cachetools import LRUCache
+
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional: fall back to plain Python kernels
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
 
 
 @dataclass
@@ -36,6 +47,29 @@ class WalletData:
     monthly_snapshots: list[MonthlySnapshot]  
     first_tx_date: Optional[str] = None       
 
+    # Column (SoA) views of utxos / monthly_snapshots consumed by the
+    # sub-scorers; built once from the lists when not supplied
+    utxo_values: Optional[np.ndarray] = field(default=None, repr=False, compare=False)     # int64
+    utxo_ages: Optional[np.ndarray] = field(default=None, repr=False, compare=False)       # int32
+    snap_balances: Optional[np.ndarray] = field(default=None, repr=False, compare=False)   # int64
+    snap_tx_counts: Optional[np.ndarray] = field(default=None, repr=False, compare=False)  # int32
+
+    def __post_init__(self):
+        n_utxos = len(self.utxos)
+        n_snaps = len(self.monthly_snapshots)
+        if self.utxo_values is None:
+            self.utxo_values = np.fromiter(
+                (u.value_sats for u in self.utxos), dtype=np.int64, count=n_utxos)
+        if self.utxo_ages is None:
+            self.utxo_ages = np.fromiter(
+                (u.age_days for u in self.utxos), dtype=np.int32, count=n_utxos)
+        if self.snap_balances is None:
+            self.snap_balances = np.fromiter(
+                (s.balance_sats for s in self.monthly_snapshots), dtype=np.int64, count=n_snaps)
+        if self.snap_tx_counts is None:
+            self.snap_tx_counts = np.fromiter(
+                (s.tx_count for s in self.monthly_snapshots), dtype=np.int32, count=n_snaps)
+
 
 @dataclass
 class ScoreResult:
@@ -70,103 +104,210 @@ TIERS = [
     (650, 699, 13000, 4),
 ]
 
+# Flat (tier_id, ratio_bps) lookup indexed by score - SCORE_MIN
+_TIER_TABLE = [(4, 13000)] * (SCORE_MAX - SCORE_MIN + 1)
+for (_low, _high, _ratio, _tid) in TIERS:
+    for _s in range(_low, _high + 1):
+        _TIER_TABLE[_s - SCORE_MIN] = (_tid, _ratio)
+
+# Scores are memoized per (wallet contents, time bucket); the proof timestamp
+# is floored to the bucket so the score hash stays stable within it
+SCORE_CACHE_SIZE = 4096
+SCORE_BUCKET_SECONDS = 3600
+
+_score_cache: LRUCache = LRUCache(maxsize=SCORE_CACHE_SIZE)
+
 
 # ─── Sub-scorers ──────────────────────────────────────────────────────────────
 
-def score_hodl_duration(utxos: list[UTXO]) -> float:
+def _hodl_kernel(values, ages):
+    """
+    Loop form of the hodl score, for the ahead-of-time build only.
+    At runtime without the extension the vectorized NumPy path is used.
+    """
+    total = 0.0
+    weighted = 0.0
+    for i in range(values.shape[0]):
+        v = float(values[i])
+        total += v
+        weighted += v * (1.0 - np.exp(-ages[i] / 730.0))
+    if total == 0.0:
+        return 0.0
+    return min(weighted / total, 1.0)
+
+
+def score_hodl_duration(value_sats: np.ndarray, age_days: np.ndarray) -> float:
     """
     Returns 0.0–1.0.
     Weighted average of UTXO age: older coins scored higher.
     Uses diminishing returns curve: score = 1 - exp(-age_days / 730)
     Max score (~1.0) approached at ~4+ years (1460 days).
+    Takes the int64 UTXO values and int32 UTXO ages from WalletData.
     """
-    if not utxos:
+    if value_sats.size == 0:
         return 0.0
 
-    total_value = sum(u.value_sats for u in utxos)
+    if _aot is not None:
+        return float(_aot.hodl(value_sats, age_days))
+
+    total_value = value_sats.sum()
     if total_value == 0:
         return 0.0
 
-    weighted_score = 0.0
-    for utxo in utxos:
-        raw = 1.0 - np.exp(-utxo.age_days / 730.0)
-        weighted_score += raw * (utxo.value_sats / total_value)
+    # Vectorized: one exp over all ages instead of a per-UTXO Python loop.
+    # float64 throughout, matching _hodl_kernel, so the score hash doesn't
+    # depend on whether the AOT extension was built
+    raw = 1.0 - np.exp(-age_days / 730.0)
+    weighted_score = (value_sats.astype(np.float64) @ raw) / total_value
 
-    return min(weighted_score, 1.0)
+    return float(min(weighted_score, 1.0))
 
 
-def score_tx_frequency(snapshots: list[MonthlySnapshot]) -> float:
-    """
-    Returns 0.0–1.0.
-    Scores based on how close monthly tx counts are to the ideal range (2-8).
-    Penalizes inactivity (<1/month) and high trading frequency (>20/month).
-    """
-    if not snapshots:
-        return 0.0
-
-    monthly_scores = []
-    for snap in snapshots[-12:]:  
-        count = snap.tx_count
+@njit(cache=True)
+def _freq_kernel(counts):
+    """Mean per-month frequency score over an int32 array of tx counts."""
+    n = counts.shape[0]
+    total = 0.0
+    for i in range(n):
+        count = counts[i]
         if count == 0:
-            monthly_scores.append(0.1)  
+            total += 0.1
         elif count <= 1:
-            monthly_scores.append(0.4)
+            total += 0.4
         elif FREQ_IDEAL_MIN <= count <= FREQ_IDEAL_MAX:
-            monthly_scores.append(1.0)
+            total += 1.0
         elif count <= 15:
             # Gradually decrease from 1.0 to 0.5 between 8 and 15
-            monthly_scores.append(1.0 - 0.07 * (count - FREQ_IDEAL_MAX))
+            total += 1.0 - 0.07 * (count - FREQ_IDEAL_MAX)
         elif count <= 20:
-            monthly_scores.append(0.4)
+            total += 0.4
         else:
-            monthly_scores.append(0.1)  
+            total += 0.1
+    return total / n
+
+
+def score_tx_frequency(tx_counts: np.ndarray) -> float:
+    """
+    Returns 0.0–1.0.
+    Scores based on how close monthly tx counts are to the ideal range (2-8).
+    Penalizes inactivity (<1/month) and high trading frequency (>20/month).
+    Takes the int32 per-month tx counts from WalletData.
+    """
+    if tx_counts.size == 0:
+        return 0.0
+
+    return float(_freq_impl(tx_counts[-12:]))
+
+
+@njit(cache=True, fastmath=True)
+def _stability_kernel(balances):
+    """
+    Single-pass mean, population std and least-squares slope of balances
+    against their index. Returns (mean, std, slope).
+    """
+    n = balances.shape[0]
+
+    s = 0.0
+    for i in range(n):
+        s += balances[i]
+    mean = s / n
+
+    # x = 0..n-1, so mean(x) and sum((x - mean(x))^2) have closed forms
+    x_mean = (n - 1) / 2.0
+    x_var = n * (n * n - 1) / 12.0
+    var = 0.0
+    cov = 0.0
+    for i in range(n):
+        d = balances[i] - mean
+        var += d * d
+        cov += (i - x_mean) * d
 
-    return float(np.mean(monthly_scores))
+    std = (var / n) ** 0.5
+    slope = cov / x_var if x_var > 0.0 else 0.0
+    return mean, std, slope
 
 
-def score_balance_stability(snapshots: list[MonthlySnapshot]) -> float:
+def score_balance_stability(balance_sats: np.ndarray) -> float:
     """
     Returns 0.0–1.0.
     Uses coefficient of variation (std/mean) - lower is better.
     Also rewards gradual upward trend (accumulation).
+    Takes the int64 per-month balances from WalletData.
     """
-    if len(snapshots) < 2:
+    if balance_sats.size < 2:
         return 0.5  # Neutral for new wallets
 
-    balances = [s.balance_sats for s in snapshots[-12:]]
-    mean_bal = np.mean(balances)
+    balances = balance_sats[-12:].astype(np.float64)
+    mean_bal, std_bal, slope = _stability_impl(balances)
 
     if mean_bal == 0:
         return 0.0
 
-    cv = np.std(balances) / mean_bal  # Coefficient of variation
+    cv = std_bal / mean_bal  # Coefficient of variation
 
     # Base stability score (lower CV = higher score)
     # CV=0 → 1.0, CV=0.5 → ~0.6, CV=1.0 → ~0.37, CV=2.0 → ~0.13
     stability = np.exp(-cv)
 
     # Bonus for accumulation trend (positive slope)
-    if len(balances) >= 4:
-        x = np.arange(len(balances))
-        slope, _ = np.polyfit(x, balances, 1)
-        if slope > 0:
-            # Small bonus (max 0.15) for steady accumulation
-            trend_bonus = min(0.15, (slope / mean_bal) * 2)
-            stability = min(1.0, stability + trend_bonus)
+    if len(balances) >= 4 and slope > 0:
+        # Small bonus (max 0.15) for steady accumulation
+        trend_bonus = min(0.15, (slope / mean_bal) * 2)
+        stability = min(1.0, stability + trend_bonus)
 
     return float(stability)
 
 
+# ─── Ahead-of-time kernels ───────────────────────────────────────────────────
+# `python -m scoring.build_kernels` compiles the kernels above into the
+# bitcred_kernels extension. When it is present no JIT compile happens at
+# startup; otherwise the Numba JIT (or plain Python / NumPy) paths are used.
+
+try:
+    from scoring import bitcred_kernels as _aot
+except ImportError:
+    _aot = None
+
+if _aot is not None:
+    _freq_impl, _stability_impl = _aot.freq, _aot.stability
+else:
+    _freq_impl, _stability_impl = _freq_kernel, _stability_kernel
+
+
 # ─── Main Scorer ──────────────────────────────────────────────────────────────
 
+def _wallet_key(wallet: WalletData) -> bytes:
+    """Cheap 16-byte digest of everything in WalletData that affects the score."""
+    h = hashlib.blake2b(wallet.address.encode("utf-8"), digest_size=16)
+    h.update(struct.pack("<2q", wallet.utxo_values.size, wallet.snap_balances.size))
+    h.update(wallet.utxo_values.tobytes())
+    h.update(wallet.utxo_ages.tobytes())
+    h.update(wallet.snap_balances.tobytes())
+    h.update(wallet.snap_tx_counts.tobytes())
+    return h.digest()
+
+
 def compute_score(wallet: WalletData) -> ScoreResult:
     """
     Compute the full BitCred score for a wallet.
     Returns ScoreResult with all sub-scores and ZK-ready hash.
+
+    Results are memoized per wallet contents within SCORE_BUCKET_SECONDS.
     """
-    hodl_sub    = score_hodl_duration(wallet.utxos)
-    freq_sub    = score_tx_frequency(wallet.monthly_snapshots)
-    stable_sub  = score_balance_stability(wallet.monthly_snapshots)
+    bucket = int(time.time()) // SCORE_BUCKET_SECONDS
+    key = (_wallet_key(wallet), bucket)
+
+    result = _score_cache.get(key)
+    if result is None:
+        result = _compute_score(wallet, bucket * SCORE_BUCKET_SECONDS)
+        _score_cache[key] = result
+    return result
+
+
+def _compute_score(wallet: WalletData, timestamp: int) -> ScoreResult:
+    hodl_sub    = score_hodl_duration(wallet.utxo_values, wallet.utxo_ages)
+    freq_sub    = score_tx_frequency(wallet.snap_tx_counts)
+    stable_sub  = score_balance_stability(wallet.snap_balances)
 
     # Weighted composite (0.0–1.0)
     composite = (
@@ -180,18 +321,11 @@ def compute_score(wallet: WalletData) -> ScoreResult:
     raw_score = max(SCORE_MIN, min(SCORE_MAX, raw_score))
 
     # Determine tier
-    tier_id = 4
-    ratio_bps = 13000
-    for (low, high, ratio, tid) in TIERS:
-        if low <= raw_score <= high:
-            tier_id = tid
-            ratio_bps = ratio
-            break
+    tier_id, ratio_bps = _TIER_TABLE[raw_score - SCORE_MIN]
 
     # Build score hash:
     # hash(wallet_address + score_tier + timestamp)
     # Last nibble encodes tier (for on-chain ratio lookup)
-    timestamp = int(time.time())
     proof_input = {
         "wallet_address": wallet.address,
         "score_tier": tier_id,
@@ -202,7 +336,7 @@ def compute_score(wallet: WalletData) -> ScoreResult:
     }
 
     raw_hash = hashlib.sha256(
-        json.dumps(proof_input, sort_keys=True).encode()
+        orjson.dumps(proof_input, option=orjson.OPT_SORT_KEYS)
     ).hexdigest()
 
     # Embed tier in last nibble of hash (for Starknet contract ratio lookup)
@@ -223,6 +357,12 @@ def compute_score(wallet: WalletData) -> ScoreResult:
 # ─── Quick test ───────────────────────────────────────────────────────────────
 
 if __name__ == "__main__":
+    # Numba's on-disk kernel cache records this module as scoring.scorer;
+    # make that importable when the file is run directly
+    import sys
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
     # Example: 4-year hodler with stable accumulation
     wallet = WalletData(
         address="bc1qexample",
@@ -1,15 +1,21 @@
 import os, sys
+import asyncio
+import time
 sys.path.insert(0, '.')
 from dotenv import load_dotenv
 load_dotenv()
 
-import aiohttp
+import httpx
+import orjson
+from cachetools import LRUCache, TTLCache
 from starknet_py.net.full_node_client import FullNodeClient
 from starknet_py.contract import Contract
 from starknet_py.net.models.chains import StarknetChainId
 from starknet_py.net.account.account import Account
 from starknet_py.net.signer.stark_curve_signer import KeyPair
 from starknet_py.net.client_models import ResourceBounds
+from starknet_py.hash.selector import get_selector_from_name
+from starknet_py.transaction_errors import TransactionRevertedError
 
 REGISTRY_ADDRESS    = os.getenv("REGISTRY_ADDRESS", "0x0")
 LENDING_ADDRESS     = os.getenv("LENDING_ADDRESS",  "0x0")
@@ -21,6 +27,20 @@ WRITE_RPC = READ_RPC
 
 REGISTRY_ADDRESS_INT = int(REGISTRY_ADDRESS, 16)
 LENDING_ADDRESS_INT  = int(LENDING_ADDRESS,  16)
+SCORER_PRIVATE_KEY_INT  = int(SCORER_PRIVATE_KEY  or "0x0", 16)
+SCORER_ACCOUNT_ADDR_INT = int(SCORER_ACCOUNT_ADDR or "0x0", 16)
+
+# Derived once per process; None when no scorer key is configured (read-only mode)
+_KEY_PAIR = KeyPair.from_private_key(SCORER_PRIVATE_KEY_INT) if SCORER_PRIVATE_KEY_INT else None
+
+# ScoreRegistry.MIN_UPDATE_INTERVAL — 30 days between update_score calls
+MIN_UPDATE_INTERVAL = 2_592_000
+
+# View-call results against "latest" are reused for this many seconds
+CALL_CACHE_TTL = float(os.getenv("STARKNET_CALL_CACHE_TTL", "2.0"))
+
+# How long a submitter waits for its transaction to be accepted on L2
+TX_CONFIRM_TIMEOUT = float(os.getenv("STARKNET_TX_CONFIRM_TIMEOUT", "120"))
 
 # Skip estimate_fee RPC call entirely by providing explicit bounds
 L1_BOUNDS = ResourceBounds(max_amount=100_000, max_price_per_unit=10**12)
@@ -42,60 +62,97 @@ LENDING_ABI = [
     {"name":"get_available_liquidity","type":"function","inputs":[],"outputs":[{"type":"core::integer::u256"}],"state_mutability":"view"},
 ]
 
+# Hex entry-point selectors (starknet_keccak of the name), computed once
+_SELECTORS: dict[str, str] = {
+    entry["name"]: hex(get_selector_from_name(entry["name"]))
+    for entry in REGISTRY_ABI + LENDING_ABI
+}
+
+
+def _selector(entry_point: str) -> str:
+    selector = _SELECTORS.get(entry_point)
+    if selector is None:
+        selector = _SELECTORS[entry_point] = hex(get_selector_from_name(entry_point))
+    return selector
 
-async def _raw_get_nonce(address_int: int) -> int:
-    """
-    Call starknet_getNonce directly via aiohttp with "latest" as a plain JSON string.
-    This completely bypasses starknet_py's HTTP layer and its block_id serialization.
-    """
-    payload = {
-        "jsonrpc": "2.0",
-        "id": 1,
-        "method": "starknet_getNonce",
-        "params": {
-            "block_id": "latest",
-            "contract_address": hex(address_int)
-        }
-    }
-    async with aiohttp.ClientSession() as session:
-        async with session.post(WRITE_RPC, json=payload) as resp:
-            data = await resp.json(content_type=None)
-    if "error" in data:
-        raise RuntimeError(f"starknet_getNonce failed: {data['error']}")
-    return int(data["result"], 16)
 
+def _hex_calldata(calldata: list) -> list[str]:
+    # Most reads pass zero or one felt
+    if not calldata:
+        return []
+    if len(calldata) == 1:
+        return [hex(calldata[0])]
+    return list(map(hex, calldata))
 
-async def _raw_call(contract_address: int, entry_point: str, calldata: list, block_id="latest"):
+
+def _felts(result: list[str]) -> list[int]:
+    if len(result) == 1:
+        return [int(result[0], 16)]
+    return [int(r, 16) for r in result]
+
+
+class _CallCache:
     """
-    Direct RPC call to starknet_call, bypassing starknet_py serialization issues.
+    starknet_call results keyed by (contract, entry_point, calldata, block).
+    Reads against a moving tag ("latest"/"pending") expire after
+    CALL_CACHE_TTL seconds; reads pinned to a block never change and are
+    kept in a plain LRU.
     """
-    from starknet_py.hash.selector import get_selector_from_name
-    
-    payload = {
-        "jsonrpc": "2.0",
-        "id": 1,
-        "method": "starknet_call",
-        "params": {
-            "request": {
-                "contract_address": hex(contract_address),
-                "entry_point_selector": hex(get_selector_from_name(entry_point)),
-                "calldata": [hex(c) for c in calldata]
-            },
-            "block_id": block_id
-        }
-    }
-    async with aiohttp.ClientSession() as session:
-        async with session.post(READ_RPC, json=payload) as resp:
-            data = await resp.json(content_type=None)
-    if "error" in data:
-        raise RuntimeError(f"starknet_call failed: {data['error']}")
-    return [int(r, 16) for r in data["result"]]
+    _MOVING_TAGS = ("latest", "pending")
+
+    def __init__(self, maxsize: int = 4096, ttl: float = CALL_CACHE_TTL):
+        self._latest: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._pinned: LRUCache = LRUCache(maxsize=maxsize)
+
+    @staticmethod
+    def key(contract_address: int, entry_point: str, calldata: list, block_id) -> tuple:
+        if isinstance(block_id, dict):
+            block_id = tuple(sorted(block_id.items()))
+        return (contract_address, entry_point, tuple(calldata), block_id)
+
+    def _store(self, key: tuple):
+        return self._latest if key[3] in self._MOVING_TAGS else self._pinned
+
+    def get(self, key: tuple):
+        return self._store(key).get(key)
+
+    def put(self, key: tuple, result: list[int]):
+        self._store(key)[key] = result
+
+    def invalidate(self, contract_address: int):
+        """Drop cached "latest" reads of a contract after writing to it."""
+        for key in [k for k in list(self._latest.keys()) if k[0] == contract_address]:
+            self._latest.pop(key, None)
+
+    def clear(self):
+        self._latest.clear()
+        self._pinned.clear()
+
+
+class SubmissionRejected(ValueError):
+    """A score submission that would revert on-chain, refused before sending."""
+
+
+class BatchNotSupported(RuntimeError):
+    """The RPC node answered a JSON-RPC batch with a single error object."""
+
+
+_NONCE_ERRORS = ("nonce_mismatch", "invalid transaction nonce", "invalidtransactionnonce")
+
+
+def _is_nonce_error(exc: Exception) -> bool:
+    message = str(exc).lower()
+    return any(marker in message for marker in _NONCE_ERRORS)
 
 
 class RawNonceAccount(Account):
     """Account subclass that fetches nonce via raw HTTP — bypasses starknet_py block_id bugs."""
+    def __init__(self, *, rpc: "StarknetClient", **kwargs):
+        super().__init__(**kwargs)
+        self._rpc = rpc
+
     async def get_nonce(self, block_number=None):
-        return await _raw_get_nonce(self.address)
+        return await self._rpc._raw_get_nonce(self.address)
 
 
 class StarknetClient:
@@ -105,6 +162,141 @@ class StarknetClient:
         self._registry = None
         self._lending  = None
         self._account  = None
+        self._registry_write = None
+        self._nonce: int | None = None
+        self._nonce_lock = asyncio.Lock()
+        self._http: httpx.AsyncClient | None = None
+        self._batch_supported = True
+        self._call_cache = _CallCache()
+
+    def _get_http(self) -> httpx.AsyncClient:
+        """HTTP/2 client shared by all raw RPC calls; concurrent calls multiplex on one stream."""
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+                timeout=30.0,
+            )
+        return self._http
+
+    async def _post(self, url: str, payload):
+        resp = await self._get_http().post(url, json=payload)
+        return orjson.loads(resp.content)
+
+    async def close(self):
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def _raw_get_nonce(self, address_int: int) -> int:
+        """
+        Call starknet_getNonce directly via httpx with "latest" as a plain JSON string.
+        This completely bypasses starknet_py's HTTP layer and its block_id serialization.
+        """
+        payload = {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "starknet_getNonce",
+            "params": {
+                "block_id": "latest",
+                "contract_address": hex(address_int)
+            }
+        }
+        data = await self._post(WRITE_RPC, payload)
+        if "error" in data:
+            raise RuntimeError(f"starknet_getNonce failed: {data['error']}")
+        return int(data["result"], 16)
+
+    @staticmethod
+    def _call_request(request_id: int, contract_address: int, entry_point: str,
+                      calldata: list, block_id="latest") -> dict:
+        """JSON-RPC starknet_call request object."""
+        return {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "method": "starknet_call",
+            "params": {
+                "request": {
+                    "contract_address": hex(contract_address),
+                    "entry_point_selector": _selector(entry_point),
+                    "calldata": _hex_calldata(calldata)
+                },
+                "block_id": block_id
+            }
+        }
+
+    def cache_clear(self):
+        """Forget all cached view-call results."""
+        self._call_cache.clear()
+
+    async def _raw_call(self, contract_address: int, entry_point: str, calldata: list, block_id="latest"):
+        """
+        Direct RPC call to starknet_call, bypassing starknet_py serialization issues.
+        Results are served from the view-call cache when fresh.
+        """
+        key = self._call_cache.key(contract_address, entry_point, calldata, block_id)
+        result = self._call_cache.get(key)
+        if result is None:
+            result = await self._raw_call_uncached(contract_address, entry_point, calldata, block_id)
+            self._call_cache.put(key, result)
+        return result
+
+    async def _raw_call_uncached(self, contract_address: int, entry_point: str, calldata: list,
+                                 block_id="latest") -> list[int]:
+        payload = self._call_request(1, contract_address, entry_point, calldata, block_id)
+        data = await self._post(READ_RPC, payload)
+        if "error" in data:
+            raise RuntimeError(f"starknet_call failed: {data['error']}")
+        return _felts(data["result"])
+
+    async def _raw_call_batch(self, calls: list[tuple], block_id="latest") -> list[list[int]]:
+        """
+        Several starknet_call requests in one JSON-RPC 2.0 batch POST.
+        `calls` holds (contract_address, entry_point, calldata) tuples;
+        results come back in the same order.
+        """
+        payload = [
+            self._call_request(i, contract_address, entry_point, calldata, block_id)
+            for i, (contract_address, entry_point, calldata) in enumerate(calls)
+        ]
+        data = await self._post(READ_RPC, payload)
+        if not isinstance(data, list):
+            raise BatchNotSupported(f"starknet_call batch rejected: {data.get('error', data)}")
+
+        results: list[list[int]] = [[] for _ in calls]
+        for item in data:
+            if "error" in item:
+                raise RuntimeError(f"starknet_call failed: {item['error']}")
+            results[item["id"]] = _felts(item["result"])
+        return results
+
+    async def multicall(self, calls: list[tuple], block_id="latest") -> list[list[int]]:
+        """
+        Batched view calls: [(contract_address, entry_point, calldata), ...].
+        Only calls missing from the view-call cache hit the node. Nodes
+        without JSON-RPC batch support get the calls concurrently instead.
+        """
+        keys = [self._call_cache.key(*call, block_id) for call in calls]
+        results = [self._call_cache.get(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if not missing:
+            return results
+
+        fetched = None
+        if self._batch_supported and len(missing) > 1:
+            try:
+                fetched = await self._raw_call_batch([calls[i] for i in missing], block_id)
+            except BatchNotSupported:
+                self._batch_supported = False
+        if fetched is None:
+            fetched = await asyncio.gather(*(
+                self._raw_call_uncached(*calls[i], block_id) for i in missing
+            ))
+
+        for i, result in zip(missing, fetched):
+            results[i] = result
+            self._call_cache.put(keys[i], result)
+        return results
 
     async def _get_registry(self):
         if self._registry is None:
@@ -120,67 +312,119 @@ class StarknetClient:
 
     async def _get_account(self):
         if self._account is None:
+            if _KEY_PAIR is None:
+                raise RuntimeError("SCORER_PRIVATE_KEY is not configured")
             self._account = RawNonceAccount(
+                rpc=self,
                 client=self._wnode,
-                address=int(SCORER_ACCOUNT_ADDR, 16),
-                key_pair=KeyPair.from_private_key(int(SCORER_PRIVATE_KEY, 16)),
+                address=SCORER_ACCOUNT_ADDR_INT,
+                key_pair=_KEY_PAIR,
                 chain=StarknetChainId.SEPOLIA,
             )
+            self._registry_write = Contract(
+                address=REGISTRY_ADDRESS_INT, abi=REGISTRY_ABI, provider=self._account)
         return self._account
 
     # ── Read methods (using raw RPC calls) ────────────────────────────────────
 
     async def get_score(self, btc_address_hash):
-        result = await _raw_call(REGISTRY_ADDRESS_INT, "get_score", [btc_address_hash])
+        result = await self._raw_call(REGISTRY_ADDRESS_INT, "get_score", [btc_address_hash])
         return result[0] if result else 0
 
     async def get_collateral_ratio(self, btc_address_hash):
-        result = await _raw_call(REGISTRY_ADDRESS_INT, "get_collateral_ratio", [btc_address_hash])
+        result = await self._raw_call(REGISTRY_ADDRESS_INT, "get_collateral_ratio", [btc_address_hash])
         return result[0] if result else 15000  # Default 150%
 
     async def get_score_tier(self, btc_address_hash):
-        result = await _raw_call(REGISTRY_ADDRESS_INT, "get_score_tier", [btc_address_hash])
+        result = await self._raw_call(REGISTRY_ADDRESS_INT, "get_score_tier", [btc_address_hash])
         return result[0] if result else 0
 
     async def get_last_updated(self, btc_address_hash):
-        result = await _raw_call(REGISTRY_ADDRESS_INT, "get_last_updated", [btc_address_hash])
+        result = await self._raw_call(REGISTRY_ADDRESS_INT, "get_last_updated", [btc_address_hash])
         return result[0] if result else 0
 
     async def is_approved_scorer(self, scorer_address):
-        result = await _raw_call(REGISTRY_ADDRESS_INT, "is_approved_scorer", [int(scorer_address, 16)])
+        result = await self._raw_call(REGISTRY_ADDRESS_INT, "is_approved_scorer", [int(scorer_address, 16)])
         return bool(result[0]) if result else False
 
     # ── Write methods ─────────────────────────────────────────────────────────
 
-    async def register_score(self, btc_address_hash, score, proof=None):
-        account  = await self._get_account()
-        registry = Contract(address=REGISTRY_ADDRESS_INT, abi=REGISTRY_ABI, provider=account)
-        nonce    = await account.get_nonce()
-        call     = registry.functions["register_score"].prepare_invoke_v3(
-                       btc_address_hash=btc_address_hash, score=score, proof=proof or [])
-        signed   = await account.sign_invoke_v3(
-                       calls=[call], nonce=nonce, l1_resource_bounds=L1_BOUNDS)
-        resp     = await account.client.send_transaction(signed)
+    async def _send_invoke(self, calls: list) -> str:
+        """
+        Sign and send prepared calls as one invoke. The account nonce is
+        tracked locally and only fetched from chain when unknown or after a
+        nonce mismatch (in which case the send is retried once).
+        """
+        account = await self._get_account()
+        async with self._nonce_lock:
+            for attempt in range(2):
+                if self._nonce is None:
+                    self._nonce = await account.get_nonce()
+                signed = await account.sign_invoke_v3(
+                    calls=calls, nonce=self._nonce, l1_resource_bounds=L1_BOUNDS)
+                try:
+                    resp = await account.client.send_transaction(signed)
+                except Exception as e:
+                    self._nonce = None  # re-sync from chain on next send
+                    if attempt == 0 and _is_nonce_error(e):
+                        continue
+                    raise
+                self._nonce += 1
+                break
+        self._call_cache.invalidate(REGISTRY_ADDRESS_INT)
         return hex(resp.transaction_hash)
 
+    async def register_score(self, btc_address_hash, score, proof=None):
+        await self._get_account()
+        call = self._registry_write.functions["register_score"].prepare_invoke_v3(
+            btc_address_hash=btc_address_hash, score=score, proof=proof or [])
+        return await self._send_invoke([call])
+
     async def update_score(self, btc_address_hash, new_score, proof=None):
-        account  = await self._get_account()
-        registry = Contract(address=REGISTRY_ADDRESS_INT, abi=REGISTRY_ABI, provider=account)
-        nonce    = await account.get_nonce()
-        call     = registry.functions["update_score"].prepare_invoke_v3(
-                       btc_address_hash=btc_address_hash, new_score=new_score, proof=proof or [])
-        signed   = await account.sign_invoke_v3(
-                       calls=[call], nonce=nonce, l1_resource_bounds=L1_BOUNDS)
-        resp     = await account.client.send_transaction(signed)
-        return hex(resp.transaction_hash)
+        await self._get_account()
+        call = self._registry_write.functions["update_score"].prepare_invoke_v3(
+            btc_address_hash=btc_address_hash, new_score=new_score, proof=proof or [])
+        return await self._send_invoke([call])
+
+    async def submit_batch(self, calls: list[tuple]) -> str:
+        """
+        Send several register_score / update_score calls as one multicall
+        invoke. Each call is (entry_point, btc_address_hash, score, proof).
+        The transaction is atomic: one failing call reverts the whole batch.
+        """
+        await self._get_account()
+        registry = self._registry_write
+        prepared = [
+            registry.functions[entry_point].prepare_invoke_v3(btc_address_hash, score, proof or [])
+            for (entry_point, btc_address_hash, score, proof) in calls
+        ]
+        return await self._send_invoke(prepared)
+
+    async def wait_for_tx(self, tx_hash: str, check_interval: float = 1.0,
+                          timeout: float = TX_CONFIRM_TIMEOUT):
+        """
+        Wait for acceptance; raises TransactionRevertedError if the invoke
+        reverted, TransactionNotReceivedError after roughly `timeout` seconds.
+        """
+        retries = max(1, int(timeout / check_interval))
+        try:
+            return await self._wnode.wait_for_tx(
+                int(tx_hash, 16), check_interval=check_interval, retries=retries)
+        finally:
+            self._call_cache.invalidate(REGISTRY_ADDRESS_INT)
 
     # ── Lending Pool reads ────────────────────────────────────────────────────
 
     async def get_position(self, starknet_address: str) -> dict:
         addr_int = int(starknet_address, 16)
         
-        # Call get_position
-        pos_result = await _raw_call(LENDING_ADDRESS_INT, "get_position", [addr_int])
+        # get_position, get_health_factor and get_max_borrow in one batch
+        pos_result, health_result, max_result = await self.multicall([
+            (LENDING_ADDRESS_INT, "get_position", [addr_int]),
+            (LENDING_ADDRESS_INT, "get_health_factor", [addr_int]),
+            (LENDING_ADDRESS_INT, "get_max_borrow", [addr_int]),
+        ])
+        
         collateral = pos_result[0] if len(pos_result) > 0 else 0
         debt_low = pos_result[1] if len(pos_result) > 1 else 0
         debt_high = pos_result[2] if len(pos_result) > 2 else 0
@@ -188,14 +432,10 @@ class StarknetClient:
         ratio = pos_result[3] if len(pos_result) > 3 else 0
         liquidatable = bool(pos_result[4]) if len(pos_result) > 4 else False
         
-        # Call get_health_factor
-        health_result = await _raw_call(LENDING_ADDRESS_INT, "get_health_factor", [addr_int])
         health_low = health_result[0] if len(health_result) > 0 else 0
         health_high = health_result[1] if len(health_result) > 1 else 0
         health = (health_high << 128) | health_low
         
-        # Call get_max_borrow
-        max_result = await _raw_call(LENDING_ADDRESS_INT, "get_max_borrow", [addr_int])
         max_low = max_result[0] if len(max_result) > 0 else 0
         max_high = max_result[1] if len(max_result) > 1 else 0
         max_borrow = (max_high << 128) | max_low
@@ -212,7 +452,120 @@ class StarknetClient:
         }
 
     async def get_available_liquidity(self) -> int:
-        result = await _raw_call(LENDING_ADDRESS_INT, "get_available_liquidity", [])
+        result = await self._raw_call(LENDING_ADDRESS_INT, "get_available_liquidity", [])
         if len(result) >= 2:
             return (result[1] << 128) | result[0]  # u256
-        return result[0] if result else 0
\ No newline at end of file
+        return result[0] if result else 0
+
+
+class SubmissionBatcher:
+    """
+    Collects score submissions for up to `window` seconds (or `max_batch`
+    calls) and sends them through StarknetClient.submit_batch as a single
+    transaction. Sends are pipelined on the locally tracked nonce: each
+    batch is confirmed in its own task while the next one goes out.
+
+    Submissions that would revert (already registered, not registered,
+    cooldown, or another submission for the same address still pending) are
+    refused with SubmissionRejected before queuing. If a batch still reverts,
+    its calls are resent one per transaction so each caller gets its own
+    tx hash or error.
+    """
+
+    def __init__(self, client: StarknetClient, window: float = 0.2, max_batch: int = 32):
+        self._client    = client
+        self._window    = window
+        self._max_batch = max_batch
+        self._queue: list[tuple[asyncio.Future, tuple]] = []
+        self._pending: set[int] = set()  # address hashes queued or unconfirmed
+        self._settling: set[asyncio.Task] = set()
+        self._full      = asyncio.Event()
+        self._flusher: asyncio.Task | None = None
+
+    async def _precheck(self, entry_point: str, btc_address_hash: int):
+        """Mirror ScoreRegistry's asserts against current on-chain state."""
+        last_updated = await self._client.get_last_updated(btc_address_hash)
+        if entry_point == "register_score":
+            if last_updated:
+                raise SubmissionRejected("Score already registered; use update_score")
+        elif not last_updated:
+            raise SubmissionRejected("Score not registered")
+        elif time.time() - last_updated < MIN_UPDATE_INTERVAL:
+            raise SubmissionRejected("30-day cooldown active")
+
+    async def submit(self, btc_address_hash: int, score: int, proof: list[int],
+                     entry_point: str = "register_score") -> str:
+        if btc_address_hash not in self._pending:
+            await self._precheck(entry_point, btc_address_hash)
+        if btc_address_hash in self._pending:
+            raise SubmissionRejected("A submission for this address is already pending")
+        self._pending.add(btc_address_hash)
+
+        fut = asyncio.get_running_loop().create_future()
+        self._queue.append((fut, (entry_point, btc_address_hash, score, proof)))
+        if len(self._queue) >= self._max_batch:
+            self._full.set()
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._run())
+        return await fut
+
+    @staticmethod
+    def _resolve(batch: list, tx_hash: str | None = None, error: Exception | None = None):
+        for fut, _ in batch:
+            if fut.done():
+                continue
+            if error is not None:
+                fut.set_exception(error)
+            else:
+                fut.set_result(tx_hash)
+
+    async def _send_one(self, fut: asyncio.Future, call: tuple):
+        try:
+            tx_hash = await self._client.submit_batch([call])
+            await self._client.wait_for_tx(tx_hash)
+        except Exception as e:
+            self._resolve([(fut, call)], error=e)
+        else:
+            self._resolve([(fut, call)], tx_hash)
+
+    async def _settle(self, batch: list, tx_hash: str):
+        """Confirm a sent batch and answer its callers."""
+        try:
+            try:
+                await self._client.wait_for_tx(tx_hash)
+            except TransactionRevertedError as e:
+                if len(batch) == 1:
+                    self._resolve(batch, error=e)
+                else:
+                    # The multicall is atomic, so nothing was applied: isolate the culprit(s)
+                    await asyncio.gather(*(self._send_one(fut, call) for fut, call in batch))
+            except Exception as e:
+                self._resolve(batch, error=e)
+            else:
+                self._resolve(batch, tx_hash)
+        finally:
+            for _, call in batch:
+                self._pending.discard(call[1])
+
+    async def _run(self):
+        while self._queue:
+            if len(self._queue) < self._max_batch:
+                try:
+                    await asyncio.wait_for(self._full.wait(), timeout=self._window)
+                except asyncio.TimeoutError:
+                    pass
+            self._full.clear()
+
+            batch = self._queue[:self._max_batch]
+            self._queue = self._queue[self._max_batch:]
+            try:
+                tx_hash = await self._client.submit_batch([call for _, call in batch])
+            except Exception as e:
+                self._resolve(batch, error=e)
+                for _, call in batch:
+                    self._pending.discard(call[1])
+                continue
+
+            task = asyncio.create_task(self._settle(batch, tx_hash))
+            self._settling.add(task)
+            task.add_done_callback(self._settling.discard)
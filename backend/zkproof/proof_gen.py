@@ -15,6 +15,7 @@ Roadmap to full STARK proof:
 """
 
 import hashlib
+import functools
 import secrets
 import json
 import time
@@ -23,21 +24,23 @@ from scoring.scorer import ScoreResult
 
 FELT252_BYTES = 31
 
-
+@functools.lru_cache(maxsize=8192)
 def btc_address_to_felt252(btc_address: str) -> int:
     """
     Deterministically hash a Bitcoin address to a felt252 integer.
     This becomes the on-chain key in ScoreRegistry.scores LegacyMap.
 
-    Uses SHA256 truncated to 31 bytes to stay within felt252 range.
+    Uses SHA256 truncated to 31 bytes (top 248 bits) to stay within felt252 range.
     The same address always produces the same hash — privacy comes from
-    the fact that the raw address is never stored on-chain.
+    the fact that the raw address is never stored on-chain. Memoized, since
+    the same address is hashed several times per request.
     """
     raw = hashlib.sha256(btc_address.encode("utf-8")).digest()
-    truncated = raw[:FELT252_BYTES]
-    return int.from_bytes(truncated, "big")
+    # Dropping the last byte == shifting the big-endian int right by 8 bits
+    return int.from_bytes(raw, "big") >> 8
 
 
+@functools.lru_cache(maxsize=8192)
 def btc_address_to_hex_felt(btc_address: str) -> str:
     """Returns hex string suitable for Starknet calldata."""
     return hex(btc_address_to_felt252(btc_address))
@@ -45,11 +48,11 @@ def btc_address_to_hex_felt(btc_address: str) -> str:
 
 # ─── Proof data structures ────────────────────────────────────────────────────
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ZKProof:
     btc_address_hash: int    # felt252 int — the on-chain key
     btc_address_hash_hex: str
-    commitment: int          # felt252 int — hash(address_hash + tier + nonce)
+    commitment: int          # felt252 int — blake2b(address_hash + tier + nonce)
     commitment_hex: str
     nonce_hex: str           # kept private by user / backend
     tier: int
@@ -57,12 +60,12 @@ class ZKProof:
     timestamp: int
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class OnchainCalldata:
     """Ready-to-submit fields for ScoreRegistry.register_score / update_score"""
     btc_address_hash: int    # felt252
     score: int               # u16
-    proof: list[int]         # Span<felt252> — commitment for demo, full proof later
+    proof: tuple[int, ...]   # Span<felt252> — commitment for demo, full proof later
 
 
 # ─── Proof generation ─────────────────────────────────────────────────────────
@@ -71,7 +74,7 @@ def generate_proof(btc_address: str, score_result: ScoreResult) -> ZKProof:
     """
     Generate a commitment proof for a scored Bitcoin wallet.
 
-    Commitment = SHA256(address_hash_bytes || tier_byte || nonce_bytes)
+    Commitment = BLAKE2b-248(address_hash_bytes || tier_byte || nonce_bytes || timestamp)
     - address_hash: ties proof to specific BTC wallet (no raw address on-chain)
     - tier:         the only score data published (1-4)
     - nonce:        random 32 bytes — prevents brute-force tier lookup
@@ -83,9 +86,14 @@ def generate_proof(btc_address: str, score_result: ScoreResult) -> ZKProof:
     tier_byte = score_result.tier.to_bytes(1, "big")
     timestamp = int(time.time())
 
-    raw = address_hash_bytes + tier_byte + nonce_bytes + timestamp.to_bytes(8, "big")
-    commitment_bytes = hashlib.sha256(raw).digest()[:FELT252_BYTES]
-    commitment_int = int.from_bytes(commitment_bytes, "big")
+    # blake2b emits exactly 31 bytes, so the digest is already a felt252.
+    # Fields are fed incrementally rather than concatenated first.
+    hasher = hashlib.blake2b(digest_size=FELT252_BYTES)
+    hasher.update(address_hash_bytes)
+    hasher.update(tier_byte)
+    hasher.update(nonce_bytes)
+    hasher.update(timestamp.to_bytes(8, "big"))
+    commitment_int = int.from_bytes(hasher.digest(), "big")
 
     return ZKProof(
         btc_address_hash=address_hash_int,
@@ -110,7 +118,7 @@ def proof_to_calldata(proof: ZKProof) -> OnchainCalldata:
     return OnchainCalldata(
         btc_address_hash=proof.btc_address_hash,
         score=proof.score,
-        proof=[proof.commitment],  # Demo: commitment only. Production: full STARK proof.
+        proof=(proof.commitment,),  # Demo: commitment only. Production: full STARK proof.
     )
 
 
@@ -119,7 +127,7 @@ def calldata_to_dict(calldata: OnchainCalldata) -> dict:
     return {
         "btc_address_hash": hex(calldata.btc_address_hash),
         "score": calldata.score,
-        "proof": [hex(p) for p in calldata.proof],
+        "proof": list(map(hex, calldata.proof)),
     }
 
 
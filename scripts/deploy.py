@@ -1,13 +1,19 @@
 import asyncio
 import argparse
-import json
+import functools
 import os
+import sys
+import aiohttp
+import orjson
 from pathlib import Path
 from starknet_py.net.full_node_client import FullNodeClient
 from starknet_py.net.account.account import Account
 from starknet_py.net.models.chains import StarknetChainId
 from starknet_py.net.signer.stark_curve_signer import KeyPair
 from starknet_py.contract import Contract
+from starknet_py.net.client_errors import ClientError
+from starknet_py.net.client_models import TransactionExecutionStatus, TransactionFinalityStatus
+from starknet_py.transaction_errors import TransactionNotReceivedError, TransactionRevertedError
 
 
 RPC_ENDPOINTS = [
@@ -19,8 +25,9 @@ RPC_ENDPOINTS = [
 
 ARTIFACTS_DIR = Path(__file__).parent.parent / "contracts" / "target" / "dev"
 
+@functools.lru_cache(maxsize=8)
 def load_contract(contract_name: str) -> tuple[dict, dict]:
-    """Load Sierra + CASM from Scarb build artifacts."""
+    """Load Sierra + CASM from Scarb build artifacts (parsed once per contract)."""
     sierra_path = ARTIFACTS_DIR / f"contracts_{contract_name}.contract_class.json"
     casm_path   = ARTIFACTS_DIR / f"contracts_{contract_name}.compiled_contract_class.json"
 
@@ -29,27 +36,73 @@ def load_contract(contract_name: str) -> tuple[dict, dict]:
     if not casm_path.exists():
         raise FileNotFoundError(f"CASM not found: {casm_path}\nEnsure 'casm = true' in Scarb.toml")
 
-    with open(sierra_path) as f:
-        sierra = json.load(f)
-    with open(casm_path) as f:
-        casm = json.load(f)
+    with open(sierra_path, "rb") as f:
+        sierra = orjson.loads(f.read())
+    with open(casm_path, "rb") as f:
+        casm = orjson.loads(f.read())
 
     return sierra, casm
 
 
-async def get_working_client() -> FullNodeClient:
-    """Try RPC endpoints in order, return first that responds."""
-    for url in filter(None, RPC_ENDPOINTS):
-        try:
-            client = FullNodeClient(node_url=url)
-            await client.get_block_number()
+PROBE_TIMEOUT = 3.0  # seconds per endpoint
+
+
+async def _probe(url: str, session: aiohttp.ClientSession) -> FullNodeClient:
+    client = FullNodeClient(node_url=url, session=session)
+    await asyncio.wait_for(client.get_block_number(), timeout=PROBE_TIMEOUT)
+    return client
+
+
+async def get_working_client(session: aiohttp.ClientSession) -> FullNodeClient:
+    """
+    Probe all RPC endpoints in parallel, return the first in RPC_ENDPOINTS
+    order that responds (so a configured STARKNET_RPC_URL always wins).
+    """
+    tasks = {asyncio.create_task(_probe(url, session)): url for url in filter(None, RPC_ENDPOINTS)}
+    try:
+        # Each probe ends within PROBE_TIMEOUT, so waiting in list order
+        # costs at most one timeout over the fastest endpoint
+        for task, url in tasks.items():
+            try:
+                client = await task
+            except Exception:
+                print(f"   ❌ Unreachable: {url}")
+                continue
             print(f"   ✅ Connected: {url}\n")
             return client
-        except Exception:
-            print(f"   ❌ Unreachable: {url}")
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
     raise ConnectionError("All RPC endpoints failed.")
 
 
+POLL_INITIAL = 0.2   # seconds
+POLL_MAX     = 2.0
+POLL_TIMEOUT = 600.0
+
+
+async def wait_for_tx(client: FullNodeClient, tx_hash: int):
+    """Poll for the receipt with exponential backoff (0.2 s → 2 s) until accepted on L2."""
+    delay = POLL_INITIAL
+    deadline = asyncio.get_running_loop().time() + POLL_TIMEOUT
+    while True:
+        try:
+            receipt = await client.get_transaction_receipt(tx_hash=tx_hash)
+            if receipt.execution_status == TransactionExecutionStatus.REVERTED:
+                raise TransactionRevertedError(message=receipt.revert_reason)
+            if receipt.finality_status in (TransactionFinalityStatus.ACCEPTED_ON_L2,
+                                           TransactionFinalityStatus.ACCEPTED_ON_L1):
+                return receipt
+        except ClientError as e:
+            if "Transaction hash not found" not in e.message:
+                raise
+        if asyncio.get_running_loop().time() >= deadline:
+            raise TransactionNotReceivedError()
+        await asyncio.sleep(delay)
+        delay = min(delay * 1.5, POLL_MAX)
+
+
 async def declare_and_deploy(account: Account, contract_name: str, constructor_args: list) -> int:
     """Declare if needed, then deploy. Returns deployed contract address."""
     print(f"📝 Declaring {contract_name}...")
@@ -57,17 +110,17 @@ async def declare_and_deploy(account: Account, contract_name: str, constructor_a
 
     declare_result = await Contract.declare_v3(
         account=account,
-        compiled_contract=json.dumps(sierra),
-        compiled_contract_casm=json.dumps(casm),
+        compiled_contract=orjson.dumps(sierra).decode("utf-8"),
+        compiled_contract_casm=orjson.dumps(casm).decode("utf-8"),
     )
-    await declare_result.wait_for_acceptance()
+    await wait_for_tx(account.client, declare_result.hash)
     print(f"   Class hash: {hex(declare_result.class_hash)}")
 
     print(f"🚀 Deploying {contract_name}...")
     print(f"   Constructor args: {[hex(a) if isinstance(a, int) else a for a in constructor_args]}")
 
     deploy_result = await declare_result.deploy_v3(constructor_args=constructor_args)
-    await deploy_result.wait_for_acceptance()
+    await wait_for_tx(account.client, deploy_result.hash)
 
     address = deploy_result.deployed_contract.address
     print(f"   ✅ Address: {hex(address)}\n")
@@ -75,13 +128,23 @@ async def declare_and_deploy(account: Account, contract_name: str, constructor_a
 
 
 async def deploy(private_key: str, account_address: str):
+    # One pooled session for probing, declaring, deploying and receipt polling
+    session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=8, keepalive_timeout=60))
+    try:
+        await _deploy(session, private_key, account_address)
+    finally:
+        await session.close()
+
+
+async def _deploy(session: aiohttp.ClientSession, private_key: str, account_address: str):
     print("\n🏗️  BITCRED PYTHON DEPLOY SCRIPT")
     print("=" * 50)
     print(f"Account: {account_address}")
     print(f"Network: Starknet Sepolia\n")
 
     print("🔌 Finding working RPC endpoint...")
-    client = await get_working_client()
+    client = await get_working_client(session)
 
     account = Account(
         client=client,
@@ -140,4 +203,12 @@ if __name__ == "__main__":
     parser.add_argument("--account",     required=True, help="Starknet account address (0x...)")
     args = parser.parse_args()
 
-    asyncio.run(deploy(args.private_key, args.account))
\ No newline at end of file
+    run = asyncio.run
+    if sys.platform != "win32":  # uvloop is POSIX-only
+        try:
+            import uvloop
+            run = uvloop.run
+        except ImportError:
+            pass
+
+    run(deploy(args.private_key, args.account))
\ No newline at end of file